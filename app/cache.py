@@ -0,0 +1,60 @@
+# app/cache.py
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Read-through cache for single tasks: GET /tasks/{id} serves the stored TaskOut JSON
+# and every write to a task deletes its key. Disabled when REDIS_URL is unset.
+TASK_TTL_SECONDS = 300
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> Optional[redis.Redis]:
+    url = settings().REDIS_URL
+    if not url:
+        return None
+    return redis.Redis.from_url(url)
+
+
+def _task_key(task_id: int) -> str:
+    return f"task:{task_id}"
+
+
+# Cache errors degrade to a DB read/write instead of failing the request
+async def get_task_json(task_id: int) -> Optional[bytes]:
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        return await r.get(_task_key(task_id))
+    except RedisError:
+        logger.warning("Redis GET failed for task %s", task_id, exc_info=True)
+        return None
+
+
+async def set_task_json(task_id: int, payload: str) -> None:
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        await r.set(_task_key(task_id), payload, ex=TASK_TTL_SECONDS)
+    except RedisError:
+        logger.warning("Redis SET failed for task %s", task_id, exc_info=True)
+
+
+async def invalidate_task(task_id: int) -> None:
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        await r.delete(_task_key(task_id))
+    except RedisError:
+        # A stale entry now outlives the write until its TTL runs out
+        logger.warning("Redis DELETE failed for task %s", task_id, exc_info=True)
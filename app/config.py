@@ -1,4 +1,7 @@
 # app/config.py
+from functools import lru_cache
+from typing import Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,10 +13,26 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = Field("localhost")
     POSTGRES_PORT: int = Field(5432)
 
+    # Connection pool (size to expected concurrency; recycle before idle server timeouts)
+    DB_POOL_SIZE: int = Field(20)
+    DB_MAX_OVERFLOW: int = Field(10)
+    DB_POOL_RECYCLE: int = Field(1800)  # seconds
+    DB_POOL_TIMEOUT: int = Field(30)    # seconds to wait for a free connection
+
     # JWT / Auth
     SECRET_KEY: str = Field("dev-secret-change-me")   # override in env for prod
     ALGORITHM: str = Field("HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(1440)
+    BCRYPT_ROUNDS: int = Field(12)  # cost for bcrypt hashes (lower only in tests)
+
+    # Redis for the GET /tasks/{id} read-through cache (unset = no caching)
+    REDIS_URL: Optional[str] = Field(None)
+
+    # Create missing tables at startup (turn off when migrations own the schema)
+    AUTO_CREATE_TABLES: bool = Field(True)
+
+    # ORM: make unexpected relationship lazy-loads raise (N+1 guard; on in tests)
+    SQLA_STRICT_LOAD: bool = Field(False)
 
     # Load from environment and (optionally) a .env file
     model_config = SettingsConfigDict(
@@ -22,5 +41,10 @@ class Settings(BaseSettings):
         case_sensitive=True,
     )
 
+# Parse env/.env once per process; every caller shares the same instance
+@lru_cache(maxsize=1)
 def settings() -> Settings:
     return Settings()
+
+# Canonical name for FastAPI dependencies: Depends(get_settings)
+get_settings = settings
@@ -1,23 +1,63 @@
-from fastapi import FastAPI
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
-from .database import Base, engine
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from .config import settings
+from .database import Base, get_engine
 from . import models  # ensure models are imported before create_all
 from .routes.auth import router as auth_router
 from .routes.tasks import router as tasks_router
 
+logger = logging.getLogger(__name__)
+
+# Set once startup work (table creation) has finished; gates /health/ready
+ready_event = asyncio.Event()
+
+
+async def _deferred_init():
+    # create_all issues one existence check per table; run it without blocking startup
+    try:
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    except Exception:
+        logger.exception("Table creation failed; /health/ready stays 503")
+        return
+    ready_event.set()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Auto-create tables for all imported models
-    Base.metadata.create_all(bind=engine)
-    yield  # no teardown needed
+    init_task = None
+    if settings().AUTO_CREATE_TABLES:
+        # Start serving (and /health/live) immediately; create tables in the background
+        init_task = asyncio.create_task(_deferred_init())
+    else:
+        ready_event.set()  # schema is managed elsewhere (e.g. migrations)
+    yield
+    if init_task is not None and not init_task.done():
+        init_task.cancel()
 
-app = FastAPI(title="fastapi-todo-api", lifespan=lifespan)
+# orjson serializes response payloads (notably large task lists) in C instead of stdlib json
+app = FastAPI(
+    title="fastapi-todo-api",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 @app.get("/health")
-def health():
+@app.get("/health/live")
+async def health():
     return {"status": "ok"}
 
+@app.get("/health/ready")
+async def ready():
+    if not ready_event.is_set():
+        return ORJSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
 # Routers
 app.include_router(auth_router)     # /auth/*
 app.include_router(tasks_router)    # /tasks/*
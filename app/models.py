@@ -1,4 +1,4 @@
-from sqlalchemy import String, Text, Integer, ForeignKey, Enum
+from sqlalchemy import String, Text, Integer, ForeignKey, Enum, Index, DDL, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .database import Base
 import enum
@@ -27,6 +27,38 @@ class User(Base):
     
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Match the list queries: filter user_id/status, order by (sort col, id)
+        Index("ix_tasks_user_status_id", "user_id", "status", "id"),
+        # /tasks/mine default order: seek straight to WHERE user_id = ? AND id < cursor
+        Index("ix_tasks_user_id_id", "user_id", text("id DESC")),
+        # Same order limited to open tasks (the common "not Completed" view). The enum
+        # is stored by member NAME, hence 'COMPLETED'. PostgreSQL only: without the
+        # WHERE it would just duplicate ix_tasks_user_id_id
+        Index(
+            "ix_tasks_user_id_id_active",
+            "user_id",
+            text("id DESC"),
+            postgresql_where=text("status <> 'COMPLETED'"),
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_tasks_status_id", "status", "id"),
+        Index("ix_tasks_title_id", "title", "id"),
+        # Trigram indexes so ILIKE '%q%' on title OR description can use a
+        # BitmapOr of index scans instead of a seq scan (PostgreSQL only; elsewhere
+        # they would degrade to plain btrees that duplicate ix_tasks_title_id)
+        Index(
+            "ix_tasks_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_tasks_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -40,9 +72,16 @@ class Task(Base):
     user_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey("users.id", ondelete="CASCADE"),
-        index=True, 
-        nullable=False
+        nullable=False  # indexed as the leading column of ix_tasks_user_status_id
     )
 
     # Link to the user
-    owner: Mapped[User] = relationship("User", back_populates="tasks")
\ No newline at end of file
+    owner: Mapped[User] = relationship("User", back_populates="tasks")
+
+
+# gin_trgm_ops needs the pg_trgm extension before the tables/indexes are created
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
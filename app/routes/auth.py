@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status 
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert
 from sqlalchemy.exc import IntegrityError
-from jose import JWTError
 
 from ..database import get_db
 from .. import models, schemas
 from ..security import (
     hash_password,
-    verify_password,
+    verify_and_update_password,
     create_access_token,
     decode_token,
+    JWTError,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -23,62 +24,97 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", scheme_name="Bearer
 
 
 @router.post("/register", response_model=schemas.UserOut, summary="Register a new user")
-def register(payload: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(payload: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
     # Extra guard (schema already enforces min_length=6 -> 422)
     if len(payload.password) < 6:
         raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
 
-    user = models.User(
-        first_name=payload.first_name,
-        last_name=payload.last_name,
-        username=payload.username,
-        password=hash_password(payload.password),  # hash before storing
-    )
+    # hash before storing; the KDF is CPU-bound, so keep it off the event loop
+    hashed = await run_in_threadpool(hash_password, payload.password)
     try:
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+        # INSERT ... RETURNING: the new row comes back with the insert, no refresh SELECT
+        user = await db.scalar(
+            insert(models.User)
+            .values(
+                first_name=payload.first_name,
+                last_name=payload.last_name,
+                username=payload.username,
+                password=hashed,
+            )
+            .returning(models.User)
+        )
+        await db.commit()
         return user
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Username already exists")
 
 
 @router.post("/login", response_model=schemas.Token, summary="Login and get JWT")
-def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     # Swagger's Authorize popup posts form data (username/password) here
-    user = db.execute(
+    user = (await db.execute(
         select(models.User).where(models.User.username == form.username)
-    ).scalar_one_or_none()
+    )).scalar_one_or_none()
+
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid username or password")
 
-    if not user or not verify_password(form.password, user.password):
+    ok, new_hash = await run_in_threadpool(
+        verify_and_update_password, form.password, user.password
+    )
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid username or password")
+    if new_hash:
+        # Transparently move legacy bcrypt hashes to argon2id on successful login
+        user.password = new_hash
+        await db.commit()
 
     return schemas.Token(access_token=create_access_token(subject=user.id))
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
-) -> models.User:
-    cred_exc = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _user_id_from_token(token: str) -> int:
     try:
         payload = decode_token(token)
         sub = payload.get("sub")
         user_id = int(sub) if sub is not None else None
     except (JWTError, ValueError):
-        raise cred_exc
+        raise _credentials_exception()
+    if not user_id:
+        raise _credentials_exception()
+    return user_id
+
 
-    user = db.get(models.User, user_id) if user_id else None
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme),
+) -> models.User:
+    user = await db.get(models.User, _user_id_from_token(token))
     if not user:
-        raise cred_exc
+        raise _credentials_exception()
     return user
 
 
+# Lighter dependency for routes that only need the caller's id (e.g. /tasks):
+# checks the user still exists via the primary key without loading the full row.
+async def get_current_user_id(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme),
+) -> int:
+    user_id = _user_id_from_token(token)
+    if await db.scalar(select(models.User.id).where(models.User.id == user_id)) is None:
+        raise _credentials_exception()
+    return user_id
+
+
 # A protected endpoint so Swagger shows the "Authorize" button,
 # and to quickly verify your token works.
 @router.get(
@@ -87,5 +123,5 @@ def get_current_user(
     summary="Get current user (requires Bearer token)",
     description="Returns the authenticated user's profile. Use the Authorize button to sign in.",
 )
-def me(current_user: models.User = Depends(get_current_user)):
+async def me(current_user: models.User = Depends(get_current_user)):
     return current_user
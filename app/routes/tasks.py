@@ -1,26 +1,217 @@
 # app/routes/tasks.py
+import base64
+import json
 from typing import Optional, Literal  # Literal for safe sort values
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_  # or_ to search across multiple columns
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+from sqlalchemy import select, insert, update, delete, func, or_, tuple_  # or_ to search across multiple columns
 from sqlalchemy.exc import IntegrityError
 
+from ..config import settings
 from ..database import get_db
-from .. import models, schemas
-from .auth import get_current_user  # JWT auth dependency
+from .. import cache, models, schemas
+from .auth import get_current_user_id  # JWT auth dependency
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Loader options for ORM Task loads. TaskOut never renders Task.owner, so it isn't
+# loaded at all (no JOIN to users); with SQLA_STRICT_LOAD any relationship access
+# raises instead of silently lazy-loading (N+1 guard)
+_TASK_LOAD_OPTIONS = (raiseload("*"),) if settings().SQLA_STRICT_LOAD else ()
+
+# Columns TaskOut renders; list endpoints select just these (no ORM identity map)
+_TASK_COLUMNS = (
+    models.Task.id,
+    models.Task.title,
+    models.Task.description,
+    models.Task.status,
+    models.Task.user_id,
+)
+# ?brief=true: same rows without the description column (TaskBriefOut)
+_TASK_BRIEF_COLUMNS = tuple(c for c in _TASK_COLUMNS if c is not models.Task.description)
+
+
+# Allowed sort columns (prevents arbitrary column injection); built once at import
+_ORDER_COLS = {
+    "id": models.Task.id,
+    "title": models.Task.title,
+    "status": models.Task.status,
+    "user_id": models.Task.user_id,
+}
+_DIR = {"asc": lambda c: c.asc(), "desc": lambda c: c.desc()}
+
+
+# Shared WHERE clauses for the list endpoints (used for both items and COUNT)
+def _apply_filters(stmt, status_filter, q, user_id=None):
+    if user_id is not None:
+        stmt = stmt.where(models.Task.user_id == user_id)
+
+    if status_filter:
+        # Already a TaskStatus member from query validation; binds as-is
+        stmt = stmt.where(models.Task.status == status_filter)
+
+    # Search: case-insensitive LIKE on title OR description
+    if q:
+        like = f"%{q}%"
+        stmt = stmt.where(
+            or_(models.Task.title.ilike(like), models.Task.description.ilike(like))
+        )
+    return stmt
+
+
+# Recent COUNT results per (user_id, status, q). Paging through a list repeats the
+# same count on every request; serve repeats from memory for a few seconds.
+# Task writes in this process clear it, so only other workers' writes can be
+# stale, and then for at most the TTL.
+_COUNT_CACHE: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+
+async def _count(db, response: Response, status_filter, q, user_id=None) -> int:
+    key = (user_id, status_filter, q)
+    total = _COUNT_CACHE.get(key)
+    response.headers["X-Total-Count-Cached"] = "0" if total is None else "1"
+    if total is None:
+        total = await db.scalar(
+            _apply_filters(select(func.count(models.Task.id)), status_filter, q, user_id)
+        ) or 0
+        _COUNT_CACHE[key] = total
+    return total
+
+
+# Ids matching a search (user_id, status, q), recorded when a first page turned
+# out to hold every match. Re-sorting the same search then bounds the query by
+# primary key instead of scanning for the ILIKE. The filters are still applied,
+# so a row changed elsewhere never comes back under a search it no longer
+# matches; rows created by other workers can be missing for up to the TTL.
+# Same TTL and write invalidation as _COUNT_CACHE.
+_SEARCH_IDS: TTLCache = TTLCache(maxsize=256, ttl=30)
+
+
+def _invalidate_list_caches() -> None:
+    _COUNT_CACHE.clear()
+    _SEARCH_IDS.clear()
+
+
+# Filtered SELECT for a list endpoint, plus the key to remember its ids under
+# (None when there is nothing to remember: no search, or already a cache hit)
+def _select_filtered(columns, status_filter, q, user_id=None):
+    stmt = select(*columns)
+    if not q:
+        return _apply_filters(stmt, status_filter, q, user_id), None
+    key = (user_id, status_filter, q)
+    ids = _SEARCH_IDS.get(key)
+    if ids is not None:
+        stmt = stmt.where(models.Task.id.in_(ids))
+        return _apply_filters(stmt, status_filter, q, user_id), None
+    return _apply_filters(stmt, status_filter, q, user_id), key
+
+
+def _remember_search(key, items, next_cursor, page, cursor) -> None:
+    # A first page with nothing after it is the complete match set, so its ids
+    # come for free; deeper or partial pages are never cached
+    if key is not None and next_cursor is None and cursor is None and page == 1:
+        _SEARCH_IDS[key] = tuple(row["id"] for row in items)
+
+
+# Failure path of the conditional UPDATE/DELETE: tell "missing" (404) from "not yours" (403)
+async def _missing_or_forbidden(db, task_id: int) -> HTTPException:
+    owner_id = await db.scalar(select(models.Task.user_id).where(models.Task.id == task_id))
+    if owner_id is None:
+        return HTTPException(status_code=404, detail="Task not found")
+    return HTTPException(status_code=403, detail="You are not the owner of this task")
+
+
+# Read-only fallback when no write is needed: one column SELECT (no ORM instance)
+# that also tells "missing" (404) from "not yours" (403)
+async def _own_task_row(db, task_id: int, current_user_id: int):
+    row = (await db.execute(
+        select(*_TASK_COLUMNS).where(models.Task.id == task_id)
+    )).mappings().first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if row["user_id"] != current_user_id:
+        raise HTTPException(status_code=403, detail="You are not the owner of this task")
+    return row
+
 
-# Sort columns helper (prevents arbitrary column injection)
-def _order_column(sort_by: str):
-    if sort_by == "title":
-        return models.Task.title
+# "In Progress" -> TaskStatus.IN_PROGRESS with one dict hit (TaskStatus(v) scans members)
+_STATUS_BY_VALUE = {s.value: s for s in models.TaskStatus}
+
+
+# Parse a cursor's sort value back into the column's Python type
+def _cursor_value(sort_by: str, raw: str):
+    if sort_by in ("id", "user_id"):
+        return int(raw)
     if sort_by == "status":
-        return models.Task.status
-    if sort_by == "user_id":
-        return models.Task.user_id
-    return models.Task.id  # default + stable tie-break fallback
+        return _STATUS_BY_VALUE[raw]
+    return raw
+
+
+# Opaque keyset cursor: urlsafe base64 of JSON [sort value, id] for the last row seen
+def _encode_cursor(row, sort_by: str) -> str:
+    value = row[sort_by]
+    if isinstance(value, models.TaskStatus):
+        value = value.value
+    raw = json.dumps([str(value), row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort_by: str):
+    try:
+        raw_value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return _cursor_value(sort_by, raw_value), int(last_id)
+    except (KeyError, ValueError, TypeError):  # bad base64/JSON/shape, or a value of the wrong type
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Sorted page of Task rows (as mappings): keyset seek when a cursor is given, OFFSET otherwise.
+# Keyset compares (sort col, id) against the last row seen, so the DB seeks the
+# index instead of scanning and discarding (page - 1) * limit rows.
+async def _fetch_page(db, stmt, sort_by, sort_dir, page, limit, cursor):
+    col = _ORDER_COLS.get(sort_by, models.Task.id)  # id = default + stable tie-break
+    asc = sort_dir == "asc"
+
+    if cursor is not None:
+        value, last_id = _decode_cursor(cursor, sort_by)
+        if sort_by == "id":
+            stmt = stmt.where(models.Task.id > last_id if asc else models.Task.id < last_id)
+        else:
+            key = tuple_(col, models.Task.id)
+            bound = (value, last_id)
+            stmt = stmt.where(key > bound if asc else key < bound)
+    else:
+        stmt = stmt.offset((page - 1) * limit)
+
+    # Safe sorting + stable tie-break on id (same direction, so the cursor is exact)
+    direction = _DIR[sort_dir]
+    stmt = stmt.order_by(direction(col), direction(models.Task.id))
+
+    # One extra row tells us whether a next page exists without another query
+    rows = (await db.execute(stmt.limit(limit + 1))).mappings().all()
+    items = rows[:limit]
+    next_cursor = _encode_cursor(items[-1], sort_by) if len(rows) > limit else None
+    return items, next_cursor
+
+
+# Response for either list endpoint; page numbers don't describe a cursor page.
+# A plain dict on purpose: response_model=PaginatedTasks validates it once, whereas
+# returning a PaginatedTasks instance would be dumped and validated a second time.
+def _page_response(items, next_cursor, total, page, limit, cursor):
+    keyset = cursor is not None
+    total_pages = None
+    if total is not None and not keyset:
+        total_pages = (total + limit - 1) // limit  # ceil(total/limit)
+    return {
+        "items": items,
+        "total": total,
+        "page": None if keyset else page,
+        "limit": limit,
+        "total_pages": total_pages,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
+    }
 
 
 # 1) List all tasks (filter + search + sort + pagination with total_pages)
@@ -33,49 +224,39 @@ def _order_column(sort_by: str):
         "• **Filter**: `status` ∈ {\"New\", \"In Progress\", \"Completed\"}\n"
         "• **Search**: `q` matches title/description (case-insensitive)\n"
         "• **Sort**: `sort_by` ∈ {id,title,status,user_id}, `sort_dir` ∈ {asc,desc}\n"
-        "• **Pagination**: `page` (≥1), `limit` (1..100)"
+        "• **Pagination**: `page` (≥1), `limit` (1..100)\n"
+        "• **Cursor**: pass `next_cursor` back as `cursor` to seek past the last row (`page`/`total_pages` are then null)\n"
+        "• **Totals**: `has_more` is always set; `total`/`total_pages` only with `include_total=true`\n"
+        "• **Brief**: `brief=true` leaves `description` out of each item"
     ),
 )
-def list_tasks(
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_user),  # enforce auth
-    status_filter: Optional[schemas.StatusLiteral] = Query(default=None, alias="status"),
+async def list_tasks(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    _: int = Depends(get_current_user_id),  # enforce auth
+    status_filter: Optional[schemas.TaskStatus] = Query(default=None, alias="status"),
     q: Optional[str] = Query(default=None, description="Search in title/description"),  
     sort_by: Literal["id", "title", "status", "user_id"] = "id",  
     sort_dir: Literal["asc", "desc"] = "desc",                    
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="Opaque keyset cursor (next_cursor of the previous page)"),
+    include_total: bool = Query(False, description="Also return total/total_pages (runs a COUNT)"),
+    brief: bool = Query(False, description="Leave out description (lighter rows)"),
 ):
-    stmt = select(models.Task)
+    # Plain column rows: TaskOut validates them directly, no ORM instances per row
+    columns = _TASK_BRIEF_COLUMNS if brief else _TASK_COLUMNS
+    stmt, search_key = _select_filtered(columns, status_filter, q)
 
-    if status_filter:
-        stmt = stmt.where(models.Task.status == models.TaskStatus(status_filter))
+    items, next_cursor = await _fetch_page(db, stmt, sort_by, sort_dir, page, limit, cursor)
+    _remember_search(search_key, items, next_cursor, page, cursor)
 
-    # Search: case-insensitive LIKE on title OR description
-    if q:
-        like = f"%{q}%"
-        stmt = stmt.where(
-            or_(models.Task.title.ilike(like), models.Task.description.ilike(like))
-        )
-
-    # Count BEFORE pagination for total/total_pages
-    total = db.scalar(select(func.count()).select_from(stmt.subquery())) or 0
-    total_pages = (total + limit - 1) // limit  # ceil(total/limit)
-
-    # Safe sorting + stable tie-break on id
-    col = _order_column(sort_by)
-    order_expr = col.asc() if sort_dir == "asc" else col.desc()
-
-    items = db.execute(
-        stmt.order_by(order_expr, models.Task.id.desc())
-            .offset((page - 1) * limit)
-            .limit(limit)
-    ).scalars().all()
-
-    # Include total_pages in response (# ✅ NEWschemas.PaginatedTasks must have it)
-    return schemas.PaginatedTasks(
-        items=items, total=total, page=page, limit=limit, total_pages=total_pages
-    )
+    # COUNT(*) scans the whole filtered set, so it only runs when the client asks for it
+    # (and repeats within the TTL are served from _COUNT_CACHE)
+    total = None
+    if include_total:
+        total = await _count(db, response, status_filter, q)
+    return _page_response(items, next_cursor, total, page, limit, cursor)
 
 
 # 2) List only current user's tasks (earch/sort/paginations)
@@ -88,58 +269,54 @@ def list_tasks(
         "• **Filter**: `status` ∈ {\"New\", \"In Progress\", \"Completed\"}\n"
         "• **Search**: `q` matches title/description (case-insensitive)\n"
         "• **Sort**: `sort_by` ∈ {id,title,status,user_id}, `sort_dir` ∈ {asc,desc}\n"
-        "• **Pagination**: `page` (≥1), `limit` (1..100)"
+        "• **Pagination**: `page` (≥1), `limit` (1..100)\n"
+        "• **Cursor**: pass `next_cursor` back as `cursor` to seek past the last row (`page`/`total_pages` are then null)\n"
+        "• **Totals**: `has_more` is always set; `total`/`total_pages` only with `include_total=true`\n"
+        "• **Brief**: `brief=true` leaves `description` out of each item"
     ),
 )
-def list_my_tasks(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-    status_filter: Optional[schemas.StatusLiteral] = Query(default=None, alias="status"),
+async def list_my_tasks(
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
+    status_filter: Optional[schemas.TaskStatus] = Query(default=None, alias="status"),
     q: Optional[str] = Query(default=None, description="Search in title/description"),  
     sort_by: Literal["id", "title", "status", "user_id"] = "id",  
     sort_dir: Literal["asc", "desc"] = "desc",                    
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="Opaque keyset cursor (next_cursor of the previous page)"),
+    include_total: bool = Query(False, description="Also return total/total_pages (runs a COUNT)"),
+    brief: bool = Query(False, description="Leave out description (lighter rows)"),
 ):
-    stmt = select(models.Task).where(models.Task.user_id == current_user.id)
+    columns = _TASK_BRIEF_COLUMNS if brief else _TASK_COLUMNS
+    stmt, search_key = _select_filtered(columns, status_filter, q, current_user_id)
 
-    if status_filter:
-        stmt = stmt.where(models.Task.status == models.TaskStatus(status_filter))
-
-    # Search within my tasks
-    if q:
-        like = f"%{q}%"
-        stmt = stmt.where(
-            or_(models.Task.title.ilike(like), models.Task.description.ilike(like))
-        )
+    items, next_cursor = await _fetch_page(db, stmt, sort_by, sort_dir, page, limit, cursor)
+    _remember_search(search_key, items, next_cursor, page, cursor)
 
-    total = db.scalar(select(func.count()).select_from(stmt.subquery())) or 0
-    total_pages = (total + limit - 1) // limit
-
-    col = _order_column(sort_by)
-    order_expr = col.asc() if sort_dir == "asc" else col.desc()
-
-    items = db.execute(
-        stmt.order_by(order_expr, models.Task.id.desc())
-            .offset((page - 1) * limit)
-            .limit(limit)
-    ).scalars().all()
-
-    return schemas.PaginatedTasks(
-        items=items, total=total, page=page, limit=limit, total_pages=total_pages
-    )
+    total = None
+    if include_total:
+        total = await _count(db, response, status_filter, q, current_user_id)
+    return _page_response(items, next_cursor, total, page, limit, cursor)
 
 
 # 3) Get a specific task with JWT protection
 @router.get("/{task_id}", response_model=schemas.TaskOut, summary="Get a task by ID")
-def get_task(
+async def get_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    _: models.User = Depends(get_current_user),  # protected
+    db: AsyncSession = Depends(get_db),
+    _: int = Depends(get_current_user_id),  # protected
 ):
-    task = db.get(models.Task, task_id)
+    # Read-through cache: a hit is already TaskOut JSON, sent without touching the DB
+    cached = await cache.get_task_json(task_id)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    task = await db.get(models.Task, task_id, options=_TASK_LOAD_OPTIONS)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    await cache.set_task_json(task_id, schemas.TaskOut.model_validate(task).model_dump_json())
     return task
 
 
@@ -151,26 +328,28 @@ def get_task(
     summary="Create a task",
     description="Create a new task for the current user. Requires **Bearer** token.",
 )
-def create_task(
+async def create_task(
     payload: schemas.TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
 ):
     try:
-        task = models.Task(
-            title=payload.title,
-            description=payload.description,
-            status=models.TaskStatus(payload.status),  # cast string -> Enum
-            user_id=current_user.id,
+        # INSERT ... RETURNING: the new row comes back with the insert, no refresh SELECT
+        task = await db.scalar(
+            insert(models.Task)
+            .values(
+                title=payload.title,
+                description=payload.description,
+                status=payload.status,  # already a TaskStatus member
+                user_id=current_user_id,
+            )
+            .returning(models.Task)
         )
-        db.add(task)
-        db.commit()
-        db.refresh(task)
+        await db.commit()
+        _invalidate_list_caches()
         return task
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid status: {e}")
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Integrity error (likely invalid user_id / FK). Make sure the user exists.",
@@ -188,51 +367,60 @@ def create_task(
         "• **403** if you are not the owner"
     ),
 )
-def complete_task(
+async def complete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
 ):
-    task = db.get(models.Task, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if task.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="You are not the owner of this task")
-
-    if task.status != models.TaskStatus.COMPLETED:
-        task.status = models.TaskStatus.COMPLETED
-        db.commit()
-        db.refresh(task)
+    # One round-trip: ownership check + write + read back in a single UPDATE ... RETURNING
+    task = await db.scalar(
+        update(models.Task)
+        .where(
+            models.Task.id == task_id,
+            models.Task.user_id == current_user_id,
+            models.Task.status != models.TaskStatus.COMPLETED,
+        )
+        .values(status=models.TaskStatus.COMPLETED)
+        .returning(models.Task)
+    )
+    if task is not None:
+        await db.commit()
+        _invalidate_list_caches()
+        await cache.invalidate_task(task_id)
+        return task
 
-    return task
+    # Nothing updated: missing, not ours, or already Completed (idempotent)
+    return await _own_task_row(db, task_id, current_user_id)
 
 
 # 5) Update an existing task (owner-only)
 @router.patch("/{task_id}", response_model=schemas.TaskOut, summary="Update a task (owner-only)")
-def update_task(
+async def update_task(
     task_id: int,
     payload: schemas.TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
 ):
-    task = db.get(models.Task, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if task.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="You are not the owner of this task")
-
+    # Invalid statuses were already rejected by the schema (422)
     data = payload.model_dump(exclude_unset=True)
-    if "status" in data and data["status"] is not None:
-        try:
-            data["status"] = models.TaskStatus(data["status"])
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid status")
 
-    for field, value in data.items():
-        setattr(task, field, value)
+    if not data:
+        # Empty PATCH: nothing to write, just return the task if it's ours
+        return await _own_task_row(db, task_id, current_user_id)
+
+    # Ownership check + write + read back in a single UPDATE ... RETURNING
+    task = await db.scalar(
+        update(models.Task)
+        .where(models.Task.id == task_id, models.Task.user_id == current_user_id)
+        .values(**data)
+        .returning(models.Task)
+    )
+    if task is None:
+        raise await _missing_or_forbidden(db, task_id)
 
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    _invalidate_list_caches()
+    await cache.invalidate_task(task_id)
     return task
 
 
@@ -243,17 +431,21 @@ def update_task(
     summary="Delete a task (owner-only)",
     description="Delete a task permanently if you are the owner. Requires **Bearer** token.",
 )
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id),
 ):
-    task = db.get(models.Task, task_id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if task.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="You are not the owner of this task")
+    # Single DELETE scoped to the owner; only probe the row again if nothing matched
+    result = await db.execute(
+        delete(models.Task).where(
+            models.Task.id == task_id, models.Task.user_id == current_user_id
+        )
+    )
+    if result.rowcount == 0:
+        raise await _missing_or_forbidden(db, task_id)
 
-    db.delete(task)
-    db.commit()
+    await db.commit()
+    _invalidate_list_caches()
+    await cache.invalidate_task(task_id)
     return None
@@ -1,15 +1,17 @@
 # app/schemas.py
-from typing import Optional, Literal
+from typing import Optional, Union
 from pydantic import BaseModel, Field, ConfigDict
 from . import models  # import the Enum so TaskOut can accept it
 
-# Requests should only allow these exact strings:
-StatusLiteral = Literal["New", "In Progress", "Completed"]
+# Requests should only allow these exact strings. Validating straight into the
+# model's str-Enum uses pydantic's enum validator and hands routes a value
+# that binds to the Status column as-is (no per-request cast)
+TaskStatus = models.TaskStatus
 
 class TaskBase(BaseModel):
     title: str = Field(min_length=1, max_length=200)
     description: Optional[str] = None
-    status: StatusLiteral = "New"
+    status: TaskStatus = TaskStatus.NEW
 
 class TaskCreate(TaskBase):
     pass
@@ -17,25 +19,38 @@ class TaskCreate(TaskBase):
 class TaskUpdate(BaseModel):
     title: Optional[str] = Field(default=None, min_length=1, max_length=200)
     description: Optional[str] = None
-    status: Optional[StatusLiteral] = None
+    status: Optional[TaskStatus] = None
 
 class TaskOut(BaseModel):
     id: int
     title: str
     description: Optional[str] = None
     # Accept Enum from the ORM, but serialize to its string value automatically
-    status: models.TaskStatus
+    status: TaskStatus
     user_id: int
 
     # Accept attributes from SQLAlchemy models and render Enum as its .value
     model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
+class TaskBriefOut(BaseModel):
+    # List rows without the (possibly long) description, for ?brief=true
+    id: int
+    title: str
+    status: TaskStatus
+    user_id: int
+
+    # extra="forbid": full rows (with description) are rejected here and go to TaskOut
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True, extra="forbid")
+
 class PaginatedTasks(BaseModel):
-    items: list[TaskOut]  # the actual tasks on this page
-    total: int            # total number of tasks in DB
-    page: int             # current page number
+    # the actual tasks on this page: all brief (?brief=true) or all full rows
+    items: Union[list[TaskBriefOut], list[TaskOut]] = Field(union_mode="left_to_right")
+    total: Optional[int] = None        # total number of matching tasks (only with include_total)
+    page: Optional[int] = None         # current page number (None when paging by cursor)
     limit: int            # how many per page
-    total_pages: int      # total number of pages = ceil(total / limit)
+    total_pages: Optional[int] = None  # ceil(total / limit) (only with include_total, page mode)
+    has_more: bool = False             # another page follows this one
+    next_cursor: Optional[str] = None  # opaque cursor for the next page (None on the last)
     
 class UserCreate(BaseModel):
     first_name: str
@@ -1,19 +1,44 @@
 # app/security.py
 from __future__ import annotations
 
-import os
+import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Optional
 
-from jose import JWTError, jwt
+import jwt
+from jwt import PyJWTError as JWTError
 from passlib.context import CryptContext
 
-# Read from env (with safe fallbacks for local dev)
-SECRET_KEY = os.getenv("SECRET_KEY") or "dev-secret-change-me"
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
+from .config import settings
 
-_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Read from Settings (env/.env, with safe fallbacks for local dev)
+_cfg = settings()
+SECRET_KEY = _cfg.SECRET_KEY
+ALGORITHM = _cfg.ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = _cfg.ACCESS_TOKEN_EXPIRE_MINUTES
+
+# HMAC key bytes, encoded once instead of on every encode/decode
+_KEY = SECRET_KEY.encode()
+_ALGORITHMS = [ALGORITHM]
+
+# argon2id for new hashes; bcrypt stays verifiable so existing users can still log in.
+# One module-level context shared by every call; never build one inside a function.
+# argon2 cost = OWASP's minimum profile (19 MiB, t=2, p=1); bcrypt rounds come from
+# settings so test runs can use a cheap cost without touching production
+_pwd = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,  # KiB
+    argon2__parallelism=1,
+    bcrypt__rounds=_cfg.BCRYPT_ROUNDS,
+)
+
+# passlib picks each scheme's backend lazily on first use; do it at import
+# so the first /auth/login after startup doesn't pay for backend detection
+for _scheme in _pwd.schemes():
+    _pwd.handler(_scheme).get_backend()
 
 def hash_password(plain: str) -> str:
     return _pwd.hash(plain)
@@ -21,20 +46,38 @@ def hash_password(plain: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return _pwd.verify(plain, hashed)
 
+def verify_and_update_password(plain: str, hashed: str) -> tuple[bool, Optional[str]]:
+    # (ok, new_hash): new_hash is set when a legacy bcrypt hash should be replaced
+    return _pwd.verify_and_update(plain, hashed)
+
 def create_access_token(subject: int | str, expires_minutes: Optional[int] = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=expires_minutes or ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode: dict[str, Any] = {"sub": str(subject), "exp": expire}
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, _KEY, algorithm=ALGORITHM)
+
+# Clients resend the same bearer token for its whole lifetime, so verified
+# payloads are memoized per process (bounded LRU). Failures raise and are
+# never cached; only successfully verified tokens get an entry.
+@lru_cache(maxsize=4096)
+def _decode_cached(token: str) -> tuple[tuple[str, Any], ...]:
+    return tuple(jwt.decode(token, _KEY, algorithms=_ALGORITHMS).items())
 
 def decode_token(token: str) -> dict[str, Any]:
-    # Raises jose.JWTError on invalid/expired tokens
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    # Raises JWTError (PyJWT's PyJWTError) on invalid/expired tokens
+    payload = dict(_decode_cached(token))
+    # A cache hit skips jwt.decode's own exp check, so a token cached while
+    # still valid must be re-checked against the clock on every use
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    return payload
 
 __all__ = [
     "hash_password",
     "verify_password",
+    "verify_and_update_password",
     "create_access_token",
     "decode_token",
     "JWTError",
@@ -1,53 +1,133 @@
 # tests/conftest.py
+import asyncio
 import os
-from contextlib import contextmanager
+import warnings
+from contextlib import asynccontextmanager, contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import delete, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
-from app.main import app
-from app.database import Base, get_db
-
+# Settings are read once at import, so test env must be set before importing the app
 # Ensure JWT envs exist for tests
-os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("SECRET_KEY", "test-secret-0123456789abcdef0123456789")
 os.environ.setdefault("ALGORITHM", "HS256")
 os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "1440")
+# Cheapest bcrypt cost; hashing is not what these tests are about
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Fail fast on accidental relationship lazy-loads
+os.environ["SQLA_STRICT_LOAD"] = "1"
+# passlib reads argon2.__version__ when app.security builds its CryptContext, i.e.
+# while this module imports the app (before pytest_configure below can add the filter)
+warnings.filterwarnings("ignore", category=DeprecationWarning, module="passlib.handlers.argon2")
+
+from app.main import app
+from app.database import Base, get_db
+from app import models, schemas
+from app.routes import tasks as tasks_routes
+from app.security import create_access_token, decode_token, hash_password
 
-# In-memory SQLite shared across threads
-engine = create_engine(
-    "sqlite+pysqlite:///:memory:",
+# In-memory SQLite (aiosqlite) shared across threads and event loops
+engine = create_async_engine(
+    "sqlite+aiosqlite:///:memory:",
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+# pysqlite/aiosqlite manage BEGIN themselves and break SAVEPOINT handling; let
+# SQLAlchemy emit BEGIN so each test can run inside one outer transaction
+@event.listens_for(engine.sync_engine, "connect")
+def _sqlite_autocommit(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine.sync_engine, "begin")
+def _sqlite_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+# Bound per test to the connection holding that test's outer transaction (see
+# _rollback_after_test); commits inside the app only release a SAVEPOINT
+TestingSessionLocal = async_sessionmaker(
+    autoflush=False, expire_on_commit=False, join_transaction_mode="create_savepoint"
+)
 
 # Create tables on the test engine
-Base.metadata.create_all(bind=engine)
+async def _create_tables():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+asyncio.run(_create_tables())
 
 # Disable lifespan so app.main doesn't run create_all on your Postgres engine
-@contextmanager
-def _noop_lifespan(_app):
+@asynccontextmanager
+async def _noop_lifespan(_app):
     yield
 app.router.lifespan_context = _noop_lifespan
 
-# Override get_db to use the test session
-def _override_get_db():
-    db = TestingSessionLocal()
-    try:
+# Override get_db to use the test session (installed by the client fixture)
+async def _override_get_db():
+    async with TestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-app.dependency_overrides[get_db] = _override_get_db
+# ---------- Hooks ----------
+
+# Registered here rather than in an ini file under tests/, which pytest doesn't
+# read when run from the repo root (as CI does)
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: timing/scale regression test (run with -m perf)")
+    # Same passlib warning for anything that loads the argon2 handler during a test
+    config.addinivalue_line("filterwarnings", "ignore::DeprecationWarning:passlib.handlers.argon2")
+
+# Timing-sensitive tests are noisy on shared runners: only run them when a -m
+# expression selects markers explicitly (e.g. pytest -m perf)
+def pytest_collection_modifyitems(config, items):
+    if config.option.markexpr:
+        return
+    perf = [item for item in items if item.get_closest_marker("perf")]
+    if perf:
+        config.hook.pytest_deselected(items=perf)
+        items[:] = [item for item in items if not item.get_closest_marker("perf")]
+
+# Close the pooled aiosqlite connection; its worker thread would block interpreter exit.
+# A hook rather than a session fixture so it also runs in an xdist controller, which
+# imports this module (and opens the connection) but never runs tests itself.
+def pytest_unconfigure(config):
+    asyncio.run(engine.dispose())
 
 # ---------- Fixtures ----------
 
-@pytest.fixture()
+# One client for the whole run; per-test isolation comes from _rollback_after_test below
+@pytest.fixture(scope="session")
 def client():
-    return TestClient(app)
+    app.dependency_overrides[get_db] = _override_get_db
+    # Entered once: the lifespan and the client's event-loop portal are set up a single time
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+# In-process caches would otherwise carry results across tests' rolled-back data
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    tasks_routes._invalidate_list_caches()
+
+# Each test runs inside one transaction that is rolled back afterwards: the schema
+# is created once per session and no test pays for DDL or table-wide DELETEs
+@pytest.fixture(autouse=True)
+def _rollback_after_test():
+    async def _begin():
+        conn = await engine.connect()
+        return conn, await conn.begin()
+
+    conn, outer = asyncio.run(_begin())
+    TestingSessionLocal.configure(bind=conn)
+    yield
+
+    async def _rollback():
+        await outer.rollback()
+        await conn.close()
+
+    asyncio.run(_rollback())
 
 @pytest.fixture()
 def create_user_and_token(client):
@@ -68,23 +148,143 @@ def create_user_and_token(client):
         return {"Authorization": f"Bearer {token}"}
     return _make
 
-@pytest.fixture()
-def owner_headers(create_user_and_token):
-    return create_user_and_token("owner_user")
+# The two standard users are created once per session and committed outside any
+# test's transaction, so they survive every per-test rollback; tokens are signed once
+async def _insert_committed(stmt):
+    async with engine.begin() as conn:
+        return await conn.scalar(stmt)
 
-@pytest.fixture()
-def other_headers(create_user_and_token):
-    return create_user_and_token("other_user")
+def _session_user_headers(username: str) -> dict:
+    user_id = asyncio.run(_insert_committed(
+        insert(models.User)
+        .values(first_name="Test", last_name="User", username=username,
+                password=hash_password("StrongPass1"))
+        .returning(models.User.id)
+    ))
+    return {"Authorization": f"Bearer {create_access_token(subject=user_id)}"}
+
+# The user id a set of auth headers stands for, read from the token (no /auth/me call)
+def _user_id(headers: dict) -> int:
+    return int(decode_token(headers["Authorization"].split()[1])["sub"])
+
+@pytest.fixture(scope="session")
+def owner_headers():
+    return _session_user_headers("owner_user")
+
+@pytest.fixture(scope="session")
+def other_headers():
+    return _session_user_headers("other_user")
+
+# A task that neither owner_user nor other_user owns, for read-only/forbidden probes.
+# Committed once like the users, so tests must not modify it.
+@pytest.fixture(scope="session")
+def shared_task():
+    headers = _session_user_headers("shared_owner")
+    owner_id = _user_id(headers)
+    task_id = asyncio.run(_insert_committed(
+        insert(models.Task)
+        .values(title="Shared probe target", status=models.TaskStatus.NEW, user_id=owner_id)
+        .returning(models.Task.id)
+    ))
+    return {"id": task_id, "user_id": owner_id, "headers": headers}
+
+# One committed task per status (owned by shared_task's owner), shared by a module's
+# tests and removed again when the module finishes
+@pytest.fixture(scope="module")
+def seeded_status_tasks(shared_task):
+    rows = [
+        {"title": f"Seeded {s.value}", "status": s, "user_id": shared_task["user_id"]}
+        for s in models.TaskStatus
+    ]
+
+    async def _seed():
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                insert(models.Task).returning(models.Task.id, sort_by_parameter_order=True), rows
+            )
+            return result.scalars().all()
+
+    async def _unseed(ids):
+        async with engine.begin() as conn:
+            await conn.execute(delete(models.Task).where(models.Task.id.in_(ids)))
+
+    ids = asyncio.run(_seed())
+    yield {s.value: task_id for s, task_id in zip(models.TaskStatus, ids)}
+    asyncio.run(_unseed(ids))
 
 @pytest.fixture()
-def create_task(client, owner_headers):
+def create_task(owner_headers):
+    # Seed through the route coroutine itself (same validation and INSERT ... RETURNING)
+    # without the ASGI round-trip; test_create_task_over_http keeps the POST covered
     def _make(title="Buy milk", desc="2L milk", status="New", headers=None):
-        h = headers or owner_headers
-        r = client.post("/tasks", json={
-            "title": title,
-            "description": desc,
-            "status": status
-        }, headers=h)
-        assert r.status_code in (200, 201), r.text
-        return r.json()
+        payload = schemas.TaskCreate(title=title, description=desc, status=status)
+
+        async def _create():
+            async with TestingSessionLocal() as db:
+                return await tasks_routes.create_task(
+                    payload, db=db, current_user_id=_user_id(headers or owner_headers)
+                )
+
+        return schemas.TaskOut.model_validate(asyncio.run(_create())).model_dump()
     return _make
+
+@pytest.fixture()
+def bulk_create_tasks(owner_headers):
+    # Seed many rows in one executemany INSERT (no HTTP round-trip or refresh per task);
+    # single tasks keep going through create_task and the real POST path
+    owner_id = _user_id(owner_headers)
+
+    def _make(tasks, title: str = "Task", status=models.TaskStatus.NEW, user_id=None):
+        # tasks: a count (titles "<title> 0..n-1") or a list of column dicts
+        if isinstance(tasks, int):
+            tasks = [{"title": f"{title} {i}"} for i in range(tasks)]
+        rows = [{"status": status, "user_id": user_id or owner_id, **t} for t in tasks]
+
+        async def _insert():
+            async with TestingSessionLocal() as db:
+                result = await db.execute(
+                    insert(models.Task).returning(
+                        models.Task.id, models.Task.title, sort_by_parameter_order=True
+                    ),
+                    rows,
+                )
+                created = [dict(r) for r in result.mappings()]
+                await db.commit()
+                return created
+
+        created = asyncio.run(_insert())
+        tasks_routes._invalidate_list_caches()  # as an API write would
+        return created
+    return _make
+
+@pytest.fixture()
+def run_sql():
+    # run_sql(stmt) -> rows for a SELECT, else None: one statement in the test's own transaction,
+    # committed so the app sees it and rolled back with the test like everything else
+    def _run(stmt):
+        async def _go():
+            async with TestingSessionLocal() as db:
+                result = await db.execute(stmt)
+                rows = result.all() if stmt.is_select else None
+                await db.commit()
+                return rows
+
+        return asyncio.run(_go())
+    return _run
+
+@pytest.fixture()
+def capture_sql():
+    # with capture_sql() as statements: ... -> SQL text of every statement the test engine ran
+    @contextmanager
+    def _capture():
+        statements = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", _record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", _record)
+    return _capture
@@ -1,4 +1,11 @@
 # tests/test_auth.py
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import delete, insert, select
+
+from app import models, security
+
 def test_register_short_password(client):
     r = client.post("/auth/register", json={
         "first_name": "A", "last_name": "B",
@@ -24,3 +31,41 @@ def test_register_and_login_ok(client):
 def test_me_requires_token(client):
     r = client.get("/auth/me")
     assert r.status_code == 401
+
+def test_token_for_unknown_user_rejected(client):
+    token = security.create_access_token(subject=999999)
+    r = client.get("/tasks/mine", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 401
+
+def test_cached_token_still_expires(client, monkeypatch):
+    r = client.post("/auth/register", json={
+        "first_name": "A", "username": "clockwatcher", "password": "StrongPass1"
+    })
+    token = security.create_access_token(subject=r.json()["id"], expires_minutes=1)
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200  # now cached
+
+    # Two minutes later the cached payload must be rejected, not served from the LRU
+    later = time.time() + 120
+    monkeypatch.setattr(security, "time", SimpleNamespace(time=lambda: later))
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+def test_cached_token_for_deleted_user_rejected(client, create_user_and_token, run_sql):
+    headers = create_user_and_token("soon_gone")
+    assert client.get("/tasks/mine", headers=headers).status_code == 200  # token now cached
+
+    run_sql(delete(models.User).where(models.User.username == "soon_gone"))
+
+    # The decode is cached, the user lookup is not: a deleted account loses access
+    assert client.get("/tasks/mine", headers=headers).status_code == 401
+
+def test_legacy_bcrypt_hash_upgraded_on_login(client, run_sql):
+    # Legacy user row hashed with bcrypt at the test cost (BCRYPT_ROUNDS=4 in conftest)
+    legacy = security._pwd.handler("bcrypt").hash("StrongPass1")
+    assert legacy.startswith("$2b$04$")
+    run_sql(insert(models.User).values(first_name="Old", username="legacy_user", password=legacy))
+
+    r = client.post("/auth/login", data={"username": "legacy_user", "password": "StrongPass1"})
+    assert r.status_code == 200
+    [(stored,)] = run_sql(select(models.User.password).where(models.User.username == "legacy_user"))
+    assert stored.startswith("$argon2id$")
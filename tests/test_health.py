@@ -0,0 +1,64 @@
+# tests/test_health.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.main as main
+
+
+@pytest.fixture()
+def not_ready():
+    # Start each test "not ready" and put the global flag back afterwards
+    was_set = main.ready_event.is_set()
+    main.ready_event.clear()
+    yield
+    if was_set:
+        main.ready_event.set()
+    else:
+        main.ready_event.clear()
+
+
+def _run_lifespan():
+    async def _go():
+        async with main.lifespan(main.app):
+            for _ in range(100):  # up to ~1s for the background init
+                if main.ready_event.is_set():
+                    break
+                await asyncio.sleep(0.01)
+    asyncio.run(_go())
+
+
+def test_live(client):
+    assert client.get("/health/live").json() == {"status": "ok"}
+    assert client.get("/health").status_code == 200
+
+
+def test_ready_flips_after_deferred_init(client, monkeypatch, not_ready):
+    # A throwaway DB: the shared test engine is busy holding this test's transaction
+    init_engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    monkeypatch.setattr(main, "get_engine", lambda: init_engine)
+    assert client.get("/health/ready").status_code == 503
+
+    _run_lifespan()
+    asyncio.run(init_engine.dispose())
+    r = client.get("/health/ready")
+    assert r.status_code == 200
+    assert r.json() == {"status": "ready"}
+
+
+def test_ready_without_auto_create(client, monkeypatch, not_ready):
+    monkeypatch.setattr(main, "settings", lambda: SimpleNamespace(AUTO_CREATE_TABLES=False))
+    _run_lifespan()
+    assert client.get("/health/ready").status_code == 200
+
+
+def test_ready_stays_503_when_init_fails(client, monkeypatch, not_ready):
+    class _BrokenEngine:
+        def begin(self):
+            raise RuntimeError("database unreachable")
+
+    monkeypatch.setattr(main, "get_engine", _BrokenEngine)
+    _run_lifespan()
+    assert client.get("/health/ready").status_code == 503